@@ -1,10 +1,15 @@
+import concurrent.futures
 import itertools
 import json
 import logging
 import re
+import socket
 import struct
+import threading
+import time
 import urllib.parse
-from collections import defaultdict, namedtuple
+import weakref
+from collections import OrderedDict, defaultdict, namedtuple
 from enum import Enum
 from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
@@ -118,6 +123,10 @@ TABULAR_QUERY_DATA_FAILED_STREAM_ID = 0xFFFFFFFF - 2
 TABULAR_INVALID_ROW_ID = 0xFFFFFFFFFFFF  # (1<<48)-1
 ESTORE_INVALID_EHANDLE = UINT64_MAX
 IMPORTED_OBJECTS_TABLE_NAME = "vastdb-imported-objects"
+DEFAULT_MAX_POOL_CONNECTIONS = 50
+DEFAULT_BUCKET_CACHE_TTL = 60.0  # in seconds
+DEFAULT_VERSION_CACHE_TTL = 60.0  # in seconds
+MAX_IDLE_SHARED_ADAPTERS = 16  # endpoints whose connections are kept open after their last session is released
 
 """
 S3 Tabular API
@@ -825,6 +834,75 @@ def _backoff_giveup(exc: Exception) -> bool:
     return True  # give up in case of other exceptions
 
 
+class _PooledHTTPAdapter(requests.adapters.HTTPAdapter):
+    """Keep up to `pool_maxsize` connections per host, optionally enabling TCP keep-alive probes on them."""
+
+    KEEPALIVE_SOCKET_OPTIONS = urllib3.connection.HTTPConnection.default_socket_options + [
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+    ]
+
+    def __init__(self, *, tcp_keepalive, **kwargs):
+        self.tcp_keepalive = tcp_keepalive  # must be set before `init_poolmanager()` is called
+        super().__init__(pool_block=False, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self.tcp_keepalive:
+            kwargs.setdefault('socket_options', self.KEEPALIVE_SOCKET_OPTIONS)
+        super().init_poolmanager(*args, **kwargs)
+
+
+_AdapterKey = Tuple[str, bool, int]
+
+# all shared adapters, and the number of live sessions using each one of them
+_SHARED_ADAPTERS: Dict[_AdapterKey, _PooledHTTPAdapter] = {}
+_SHARED_ADAPTER_USERS: Dict[_AdapterKey, int] = {}
+# adapters without live sessions, whose connections are kept open for reuse (least recently released first)
+_IDLE_ADAPTERS: "OrderedDict[_AdapterKey, None]" = OrderedDict()
+_SHARED_ADAPTERS_LOCK = threading.RLock()  # re-entrant, since sessions may be released by GC (see `VastdbApi`)
+
+
+def _acquire_shared_adapter(endpoint: str, *, tcp_keepalive: bool, max_pool_connections: int) -> Tuple[_AdapterKey, _PooledHTTPAdapter]:
+    """Return a process-wide adapter, so that connections are reused by all sessions targeting the same endpoint.
+
+    Adapters are keyed by endpoint, since a single pool manager keeps a limited number of host pools (evicting the
+    least recently used ones) - which would prevent connection reuse when a query is spread over many endpoints.
+    Each call must be matched by `_release_shared_adapter()`.
+    """
+    key = (endpoint, tcp_keepalive, max_pool_connections)
+    with _SHARED_ADAPTERS_LOCK:
+        _IDLE_ADAPTERS.pop(key, None)  # first, so that it can't be evicted by a concurrent release
+        adapter = _SHARED_ADAPTERS.get(key)
+        if adapter is None:
+            adapter = _SHARED_ADAPTERS[key] = _PooledHTTPAdapter(tcp_keepalive=tcp_keepalive, pool_maxsize=max_pool_connections)
+        _SHARED_ADAPTER_USERS[key] = _SHARED_ADAPTER_USERS.get(key, 0) + 1
+        return key, adapter
+
+
+def _release_shared_adapter(key: _AdapterKey):
+    """Keep the adapter's connections open for reuse, closing the least recently used idle adapters (if too many)."""
+    evicted = []
+    with _SHARED_ADAPTERS_LOCK:
+        _SHARED_ADAPTER_USERS[key] -= 1
+        if _SHARED_ADAPTER_USERS[key]:
+            return  # still used by other sessions
+        del _SHARED_ADAPTER_USERS[key]
+
+        _IDLE_ADAPTERS[key] = None
+        while len(_IDLE_ADAPTERS) > MAX_IDLE_SHARED_ADAPTERS:
+            evicted_key, _ = _IDLE_ADAPTERS.popitem(last=False)
+            evicted.append(_SHARED_ADAPTERS.pop(evicted_key))
+
+    for adapter in evicted:
+        adapter.close()  # closes the idle pooled connections
+
+
+# (endpoint URL, SSL verification) -> (monotonic timestamp of the last successful probe, VAST version)
+_VERSION_CACHE: Dict[Tuple[str, Any], Tuple[float, Tuple[int, ...]]] = {}
+# (endpoint URL, SSL verification) -> in-flight probe, allowing concurrent connections to share a single probe
+_VERSION_PROBES: Dict[Tuple[str, Any], "concurrent.futures.Future[Tuple[int, ...]]"] = {}
+_VERSION_PROBES_LOCK = threading.Lock()
+
+
 class UnsupportedServer(NotImplementedError):
     """Raised when the response comes back from non-VAST DB server."""
     pass
@@ -839,7 +917,10 @@ class VastdbApi:
             *,
             ssl_verify=True,
             timeout=None,
-            backoff_config: Optional[BackoffConfig] = None):
+            backoff_config: Optional[BackoffConfig] = None,
+            tcp_keepalive=True,
+            max_pool_connections=DEFAULT_MAX_POOL_CONNECTIONS,
+            version_cache_ttl=DEFAULT_VERSION_CACHE_TTL):
 
         from . import version  # import lazily here (to avoid circular dependencies)
         self.client_sdk_version = f"VAST Database Python SDK {version()} - 2024 (c)"
@@ -850,9 +931,15 @@ class VastdbApi:
 
         self.timeout = timeout
         self.default_max_list_columns_page_size = 1000
-        self._session = requests.Session()
-        self._session.verify = ssl_verify
-        self._session.headers['user-agent'] = self.client_sdk_version
+        self.ssl_verify = ssl_verify
+        self.tcp_keepalive = tcp_keepalive
+        self.max_pool_connections = max_pool_connections
+        # all the RPCs sent via this session (e.g. begin/commit of multiple transactions) share the same connection pool,
+        # which is also shared with other sessions (and `with_endpoint()` sessions) using the same connection settings
+        adapter_key, self._adapter = _acquire_shared_adapter(str(url), tcp_keepalive=tcp_keepalive, max_pool_connections=max_pool_connections)
+        # released when this session is closed (or garbage-collected, if it wasn't closed explicitly)
+        self._release_adapter = weakref.finalize(self, _release_shared_adapter, adapter_key)
+        self._thread_local = threading.local()  # `requests.Session` is not thread-safe, so each thread uses its own
 
         self.backoff_config = backoff_config or BackoffConfig()
         self._backoff_decorator = backoff.on_exception(
@@ -873,13 +960,70 @@ class VastdbApi:
         self.url = str(url)
         _logger.debug('url=%s aws_host=%s', self.url, self.aws_host)
 
-        self._session.auth = AWSRequestsAuth(aws_access_key=access_key,
-                                            aws_secret_access_key=secret_key,
-                                            aws_host=self.aws_host,
-                                            aws_region='',
-                                            aws_service='s3')
+        self._auth = AWSRequestsAuth(aws_access_key=access_key,
+                                     aws_secret_access_key=secret_key,
+                                     aws_host=self.aws_host,
+                                     aws_region='',
+                                     aws_service='s3')
+
+        # avoid re-probing the same endpoint, e.g. when connecting multiple times (or via `with_endpoint()`)
+        self.version_cache_ttl = version_cache_ttl
+        cached = _VERSION_CACHE.get(self._version_key)
+        if cached is not None and time.monotonic() - cached[0] < version_cache_ttl:
+            self.vast_version = cached[1]
+        else:
+            self._coalesced_refresh_version()
+
+    @property
+    def _session(self) -> requests.Session:
+        """Return current thread's HTTP session (sharing the connection pool with the other threads)."""
+        session = getattr(self._thread_local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.verify = self.ssl_verify
+            session.headers['user-agent'] = self.client_sdk_version
+            session.mount('http://', self._adapter)
+            session.mount('https://', self._adapter)
+            session.auth = self._auth
+            self._thread_local.session = session
+        return session
+
+    @property
+    def _version_key(self):
+        return (self.url, self.ssl_verify)
+
+    def _coalesced_refresh_version(self):
+        """Probe the cluster for its version, unless another thread is already probing the same endpoint."""
+        key = self._version_key
+        with _VERSION_PROBES_LOCK:
+            probe = _VERSION_PROBES.get(key)
+            is_owner = probe is None
+            if is_owner:
+                probe = _VERSION_PROBES[key] = concurrent.futures.Future()
+
+        if not is_owner:
+            self.vast_version = probe.result()  # re-raises the probe's exception (if failed)
+            return
+
+        try:
+            self.refresh_version()
+            probe.set_result(self.vast_version)
+        except BaseException as e:
+            probe.set_exception(e)
+            raise
+        finally:
+            with _VERSION_PROBES_LOCK:
+                del _VERSION_PROBES[key]
+
+    def refresh_version(self):
+        """Probe the cluster for its version, and store it in `self.vast_version`."""
+        try:
+            self._probe_version()
+        except BaseException:
+            _VERSION_CACHE.pop(self._version_key, None)  # don't let other sessions use a stale version
+            raise
 
-        # probe the cluster for its version
+    def _probe_version(self):
         res = self._request(method="GET", url=self._url(command="transaction"), skip_status_check=True)  # used only for the response headers
         _logger.debug("headers=%s code=%s content=%s", res.headers, res.status_code, res.content)
         server_header = res.headers.get("Server")
@@ -891,6 +1035,7 @@ class VastdbApi:
 
             if m := self.VAST_VERSION_REGEX.match(server_header):
                 self.vast_version: Tuple[int, ...] = tuple(int(v) for v in m.group(1).split("."))
+                _VERSION_CACHE[self._version_key] = (time.monotonic(), self.vast_version)
                 return
             else:
                 _logger.error("'Server' header '%s' doesn't match the expected pattern", server_header)
@@ -908,20 +1053,26 @@ class VastdbApi:
         return self
 
     def __exit__(self, *args):
-        """Make sure that the connections closed."""
+        """Release this session, keeping the shared pooled connections open for reuse by other sessions."""
+        self._session.adapters.clear()  # `Session.close()` would close the (shared) adapters
         self._session.close()
+        self._release_adapter()  # no-op if already released
 
     def with_endpoint(self, endpoint):
         """Open a new session for targeting a specific endpoint."""
         return VastdbApi(endpoint=endpoint,
             access_key=self.access_key,
             secret_key=self.secret_key,
-            ssl_verify=self._session.verify,
+            ssl_verify=self.ssl_verify,
             timeout=self.timeout,
-            backoff_config=self.backoff_config)
+            backoff_config=self.backoff_config,
+            tcp_keepalive=self.tcp_keepalive,
+            max_pool_connections=self.max_pool_connections,
+            version_cache_ttl=self.version_cache_ttl)
 
     def _single_request(self, *, method, url, skip_status_check=False, **kwargs):
-        _logger.debug("Sending request: %s %s %s timeout=%s", method, url, kwargs, self.timeout)
+        if _logger.isEnabledFor(logging.DEBUG):  # skip logging overhead for every RPC
+            _logger.debug("Sending request: %s %s %s timeout=%s", method, url, kwargs, self.timeout)
         try:
             res = self._session.request(method=method, url=url, timeout=self.timeout, **kwargs)
         except requests.exceptions.ConnectionError as err:
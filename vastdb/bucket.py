@@ -23,25 +23,36 @@ class Bucket:
     name: str
     tx: "transaction.Transaction"
     _root_schema: "Schema" = field(init=False, compare=False, repr=False)
+    _validated: bool = field(default=True, compare=False, repr=False)  # set to False for lazily-checked buckets
 
     def __post_init__(self):
         """Root schema is empty."""
         self._root_schema = schema.Schema(name="", bucket=self)
 
+    def _ensure_exists(self, needs_txid=True):
+        """Check bucket existence, once."""
+        if not self._validated:
+            self.tx._check_bucket(self.name, open_transaction=needs_txid)
+            self._validated = True
+
     def create_schema(self, name: str, fail_if_exists=True) -> "Schema":
         """Create a new schema (a container of tables) under this bucket."""
+        self._ensure_exists()
         return self._root_schema.create_schema(name=name, fail_if_exists=fail_if_exists)
 
     def schema(self, name: str, fail_if_missing=True) -> Optional["Schema"]:
         """Get a specific schema (a container of tables) under this bucket."""
+        self._ensure_exists()
         return self._root_schema.schema(name=name, fail_if_missing=fail_if_missing)
 
     def schemas(self, batch_size=None):
         """List bucket's schemas."""
+        self._ensure_exists()
         return self._root_schema.schemas(batch_size=batch_size)
 
     def snapshot(self, name, fail_if_missing=True) -> Optional["Bucket"]:
         """Get snapshot by name (if exists)."""
+        self._ensure_exists(needs_txid=False)
         snapshots, _is_truncated, _next_key = \
             self.tx._rpc.api.list_snapshots(bucket=self.name, name_prefix=name, max_keys=1)
 
@@ -57,6 +68,7 @@ class Bucket:
 
     def snapshots(self) -> Iterable["Bucket"]:
         """List bucket's snapshots."""
+        self._ensure_exists(needs_txid=False)
         snapshots = []
         next_key = 0
         while True:
@@ -8,7 +8,7 @@ For more details see:
 """
 
 import os
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Dict, Optional
 
 if TYPE_CHECKING:
     from .config import BackoffConfig
@@ -21,8 +21,18 @@ class Session:
                  *,
                  ssl_verify=True,
                  timeout=None,
-                 backoff_config: Optional["BackoffConfig"] = None):
-        """Connect to a VAST Database endpoint, using specified credentials."""
+                 backoff_config: Optional["BackoffConfig"] = None,
+                 tcp_keepalive=True,
+                 max_pool_connections: Optional[int] = None,
+                 bucket_cache_ttl: Optional[float] = None,
+                 version_cache_ttl: Optional[float] = None):
+        """Connect to a VAST Database endpoint, using specified credentials.
+
+        `tcp_keepalive` enables TCP keep-alive probes on the pooled HTTP connections.
+        `max_pool_connections` limits the number of idle connections kept for reuse (useful for multi-threaded access).
+        `bucket_cache_ttl` is the duration (in seconds) for which a bucket's existence is cached (use 0 to disable).
+        `version_cache_ttl` is the duration (in seconds) for which an endpoint's VAST version is cached (use 0 to disable).
+        """
         from . import _internal, features
 
         if access is None:
@@ -32,26 +42,42 @@ class Session:
         if endpoint is None:
             endpoint = os.environ['AWS_S3_ENDPOINT_URL']
 
+        if max_pool_connections is None:
+            max_pool_connections = _internal.DEFAULT_MAX_POOL_CONNECTIONS
+        if bucket_cache_ttl is None:
+            bucket_cache_ttl = _internal.DEFAULT_BUCKET_CACHE_TTL
+        if version_cache_ttl is None:
+            version_cache_ttl = _internal.DEFAULT_VERSION_CACHE_TTL
+
         self.api = _internal.VastdbApi(
             endpoint=endpoint,
             access_key=access,
             secret_key=secret,
             ssl_verify=ssl_verify,
             timeout=timeout,
-            backoff_config=backoff_config)
+            backoff_config=backoff_config,
+            tcp_keepalive=tcp_keepalive,
+            max_pool_connections=max_pool_connections,
+            version_cache_ttl=version_cache_ttl)
         self.features = features.Features(self.api.vast_version)
 
+        # bucket name -> monotonic timestamp of its last successful existence check
+        self._bucket_cache: Dict[str, float] = {}
+        self._bucket_cache_ttl = bucket_cache_ttl
+
     def __repr__(self):
         """Don't show the secret key."""
         return f'{self.__class__.__name__}(endpoint={self.api.url}, access={self.api.access_key})'
 
-    def transaction(self):
+    def transaction(self, lazy=False):
         """Create a non-initialized transaction object.
 
         It should be used as a context manager:
 
             with session.transaction() as tx:
                 tx.bucket("bucket").create_schema("schema")
+
+        A lazy transaction is opened only when its ID is first needed, and is not committed if it wasn't opened.
         """
         from . import transaction
-        return transaction.Transaction(self)
+        return transaction.Transaction(self, lazy=lazy)
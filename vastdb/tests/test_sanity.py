@@ -1,22 +1,194 @@
+import asyncio
+import concurrent.futures
 import contextlib
+import gc
 import logging
+import subprocess
+import sys
 import threading
-from http.server import BaseHTTPRequestHandler, HTTPServer
-from itertools import cycle
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 import pytest
 
 import vastdb.errors
+from vastdb import _internal
 from vastdb._internal import UnsupportedServer
 
 log = logging.getLogger(__name__)
 
 
+def test_lightweight_import():
+    # heavy dependencies should be imported only when a session is created
+    heavy_modules = ['boto3', 'ibis', 'pyarrow', 'requests']
+    code = f"import sys, vastdb; print([m for m in {heavy_modules!r} if m in sys.modules])"
+    output = subprocess.check_output([sys.executable, '-c', code], text=True)
+    assert output.strip() == '[]'
+
+
 def test_hello_world(session):
     with session.transaction() as tx:
         assert tx.txid is not None
 
 
+def test_async_transactions(session):
+    async def open_transaction():
+        async with session.transaction() as tx:
+            return tx.txid
+
+    async def open_transactions(n):
+        return await asyncio.gather(*(open_transaction() for _ in range(n)))
+
+    txids = asyncio.run(open_transactions(10))
+    assert None not in txids
+    assert len(set(txids)) == len(txids)
+
+
+def test_lazy_transaction(session, monkeypatch):
+    opened = []
+    begin_transaction = session.api.begin_transaction
+    monkeypatch.setattr(session.api, 'begin_transaction', lambda: opened.append(True) or begin_transaction())
+
+    with session.transaction(lazy=True) as tx:
+        assert repr(tx) == 'Transaction(id=deferred)'
+    assert opened == []
+
+    with session.transaction(lazy=True) as tx:
+        assert tx.txid is not None
+        assert tx.txid is not None
+    assert opened == [True]
+    assert tx.txid is None
+
+
+def test_concurrent_lazy_transaction_open(session, monkeypatch):
+    opened = []
+    begin_transaction = session.api.begin_transaction
+
+    def slow_begin_transaction():
+        opened.append(True)
+        time.sleep(0.1)
+        return begin_transaction()
+
+    monkeypatch.setattr(session.api, 'begin_transaction', slow_begin_transaction)
+
+    with session.transaction(lazy=True) as tx:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            txids = list(executor.map(lambda _: tx.txid, range(4)))
+    assert opened == [True]
+    assert len(set(txids)) == 1 and txids[0] is not None
+
+
+def test_bucket_existence_cache(session, test_bucket_name, monkeypatch):
+    checked = []
+    head_bucket = session.api.head_bucket
+    monkeypatch.setattr(session.api, 'head_bucket', lambda name: checked.append(name) or head_bucket(name))
+    monkeypatch.setattr(session, '_bucket_cache', {})
+
+    with session.transaction() as tx:
+        tx.bucket(test_bucket_name)
+        tx.bucket(test_bucket_name)
+        for _ in range(2):
+            with pytest.raises(vastdb.errors.MissingBucket):
+                tx.bucket('no-such-bucket')
+
+    assert checked == [test_bucket_name, 'no-such-bucket', 'no-such-bucket']
+
+
+def test_lazy_bucket(session, test_bucket_name, monkeypatch):
+    checked = []
+    head_bucket = session.api.head_bucket
+    monkeypatch.setattr(session.api, 'head_bucket', lambda name: checked.append(name) or head_bucket(name))
+    monkeypatch.setattr(session, '_bucket_cache', {})
+
+    with session.transaction() as tx:
+        b = tx.bucket(test_bucket_name, lazy=True)
+        assert checked == []
+        b.schemas()
+        b.schemas()
+        assert checked == [test_bucket_name]
+
+        missing = tx.bucket('no-such-bucket', lazy=True)
+        with pytest.raises(vastdb.errors.MissingBucket):
+            missing.schemas()
+
+
+def test_lazy_transaction_and_bucket(session, test_bucket_name, monkeypatch):
+    monkeypatch.setattr(session, '_bucket_cache', {})
+
+    with session.transaction(lazy=True) as tx:
+        b = tx.bucket(test_bucket_name, lazy=True)
+        assert repr(tx) == 'Transaction(id=deferred)'
+        b.schemas()  # the transaction is opened concurrently with the bucket check
+        assert repr(tx) != 'Transaction(id=deferred)'
+        assert tx.txid is not None
+
+    with session.transaction(lazy=True) as tx:
+        tx.bucket(test_bucket_name, lazy=True).snapshots()  # doesn't require opening the transaction
+        assert repr(tx) == 'Transaction(id=deferred)'
+
+
+def test_lazy_transaction_and_missing_bucket(session, monkeypatch):
+    def failing_begin_transaction():
+        raise ConnectionError("begin failed")
+
+    monkeypatch.setattr(session.api, 'begin_transaction', failing_begin_transaction)
+    monkeypatch.setattr(session, '_bucket_cache', {})
+
+    with session.transaction(lazy=True) as tx:
+        with pytest.raises(vastdb.errors.MissingBucket) as e:
+            tx.bucket('no-such-bucket', lazy=True).schemas()
+        assert isinstance(e.value.__context__, ConnectionError)
+
+
+def test_lazy_transaction_and_failed_bucket_check(session, monkeypatch):
+    begin_transaction = session.api.begin_transaction
+    calls = []
+
+    def slow_begin_transaction():
+        time.sleep(0.3)
+        calls.append('begin')
+        return begin_transaction()
+
+    def failing_head_bucket(name):
+        calls.append('head')
+        raise ConnectionError("head failed")
+
+    rollback_transaction = session.api.rollback_transaction
+    monkeypatch.setattr(session.api, 'begin_transaction', slow_begin_transaction)
+    monkeypatch.setattr(session.api, 'head_bucket', failing_head_bucket)
+    monkeypatch.setattr(session.api, 'rollback_transaction', lambda txid: calls.append('rollback') or rollback_transaction(txid))
+    monkeypatch.setattr(session, '_bucket_cache', {})
+
+    with pytest.raises(ConnectionError):
+        with session.transaction(lazy=True) as tx:
+            tx.bucket('some-bucket', lazy=True).schemas()
+
+    # the concurrently opened transaction is rolled back when exiting its context
+    assert calls == ['head', 'begin', 'rollback']
+    assert repr(tx) == 'InvalidTransaction'
+
+
+def test_shared_connection_pool(session, session_kwargs):
+    adapter = session.api._session.get_adapter(session.api.url)
+    assert vastdb.connect(**session_kwargs).api._session.get_adapter(session.api.url) is adapter
+
+    with session.api.with_endpoint(session.api.url) as api:
+        assert api._session.get_adapter(session.api.url) is adapter
+
+    # the shared pool is kept open after the `with_endpoint()` session is closed
+    with session.transaction() as tx:
+        assert tx.txid is not None
+
+
+def test_per_thread_http_sessions(session):
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        http_sessions = list(executor.map(lambda _: session.api._session, range(4)))
+
+    assert session.api._session not in http_sessions
+    adapters = {id(s.get_adapter(session.api.url)) for s in http_sessions + [session.api._session]}
+    assert len(adapters) == 1
+
+
 def test_bad_credentials(session):
     bad_session = vastdb.connect(access='BAD', secret='BAD', endpoint=session.api.url)
     with pytest.raises(vastdb.errors.Forbidden):
@@ -30,43 +202,45 @@ def test_bad_endpoint(session):
         vastdb.connect(access='BAD', secret='BAD', endpoint='http://invalid-host-name-for-tests:12345', backoff_config=backoff_config)
 
 
-def test_version_extraction():
-    # A list of version and expected version parsed by API
-    TEST_CASES = [
-            ("nginx", UnsupportedServer),                               # non-vast server
-            ("vast", NotImplementedError),                              # vast server without version in header
-            ("vast 5", NotImplementedError),                            # major
-            ("vast 5.2", NotImplementedError),                          # major.minor
-            ("vast 5.2.0", NotImplementedError),                        # major.minor.patch
-            ("vast 5.2.0.10", (5, 2, 0, 10)),                           # major.minor.patch.protocol
-            ("vast 5.2.0.10 some other things", NotImplementedError),   # suffix
-            ("vast 5.2.0.10.20", NotImplementedError),                  # extra version
-    ]
+class MockServerHandler(BaseHTTPRequestHandler):
+    """Respond with the currently configured 'Server' header (keeping the connection alive)."""
+
+    protocol_version = "HTTP/1.1"
+    server_header = "vast 5.2.0.10"
+    probes = 0
+    connections = 0
+    delay = 0.0  # in seconds
 
-    # Mock OPTIONS handle that cycles through the test cases response
-    class MockOptionsHandler(BaseHTTPRequestHandler):
-        versions_iterator = cycle(TEST_CASES)
+    def handle(self):
+        type(self).connections += 1
+        super().handle()
 
-        def __init__(self, *args) -> None:
-            super().__init__(*args)
+    def do_GET(self):
+        type(self).probes += 1
+        time.sleep(self.delay)
+        self.send_response(204)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
 
-        def do_OPTIONS(self):
-            self.send_response(204)
-            self.end_headers()
+    def version_string(self):
+        return self.server_header
 
-        def version_string(self):
-            return next(self.versions_iterator)[0]
+    def log_message(self, format, *args):
+        log.debug(format, *args)
 
-        def log_message(self, format, *args):
-            log.debug(format, *args)
+
+@contextlib.contextmanager
+def mock_server():
+    class Handler(MockServerHandler):
+        pass
 
     # start the server on localhost on some available port port
     server_address = ('localhost', 0)
-    httpd = HTTPServer(server_address, MockOptionsHandler)
+    httpd = ThreadingHTTPServer(server_address, Handler)
 
     def start_http_server_in_thread():
         log.info(f"Mock HTTP server is running on port {httpd.server_port}")
-        httpd.serve_forever()
+        httpd.serve_forever(poll_interval=0.05)
         log.info("Mock HTTP server killed")
 
     # start the server in a thread so we have the main thread to operate the API
@@ -74,13 +248,115 @@ def test_version_extraction():
     server_thread.start()
 
     try:
-        for _, expected in TEST_CASES:
+        yield f"http://localhost:{httpd.server_port}", Handler
+    finally:
+        # make sure we shut the server down no matter what
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def test_version_extraction():
+    # A list of version and expected version parsed by API
+    TEST_CASES = [
+            ("nginx", UnsupportedServer),                               # non-vast server
+            ("vast", NotImplementedError),                              # vast server without version in header
+            ("vast 5", NotImplementedError),                            # major
+            ("vast 5.2", NotImplementedError),                          # major.minor
+            ("vast 5.2.0", NotImplementedError),                        # major.minor.patch
+            ("vast 5.2.0.10", (5, 2, 0, 10)),                           # major.minor.patch.protocol
+            ("vast 5.2.0.10 some other things", NotImplementedError),   # suffix
+            ("vast 5.2.0.10.20", NotImplementedError),                  # extra version
+    ]
+
+    with mock_server() as (endpoint, handler):
+        # a single session is used for probing all the versions below
+        s = vastdb.connect(endpoint=endpoint, access="abc", secret="abc")
+        for server_header, expected in TEST_CASES:
+            handler.server_header = server_header
             manager = contextlib.nullcontext()
             if isinstance(expected, type) and issubclass(expected, NotImplementedError):
                 manager = pytest.raises(expected)
             with manager:
-                s = vastdb.connect(endpoint=f"http://localhost:{httpd.server_port}", access="abc", secret="abc")
+                s.api.refresh_version()
                 assert s.api.vast_version == expected
-    finally:
-        # make sure we shut the server down no matter what
-        httpd.shutdown()
+
+
+def test_version_cache():
+    with mock_server() as (endpoint, handler):
+        for _ in range(3):
+            s = vastdb.connect(endpoint=endpoint, access="abc", secret="abc")
+            assert s.api.vast_version == (5, 2, 0, 10)
+        with s.api.with_endpoint(endpoint) as api:
+            assert api.vast_version == (5, 2, 0, 10)
+        assert handler.probes == 1
+
+        s = vastdb.connect(endpoint=endpoint, access="abc", secret="abc", version_cache_ttl=0)
+        assert handler.probes == 2
+
+        # SSL verification is part of the cache key (as for the in-flight probes)
+        vastdb.connect(endpoint=endpoint, access="abc", secret="abc", ssl_verify=False)
+        assert handler.probes == 3
+
+        # a failed probe evicts the cached version
+        handler.server_header = "nginx"
+        with pytest.raises(UnsupportedServer):
+            s.api.refresh_version()
+        handler.server_header = MockServerHandler.server_header
+        vastdb.connect(endpoint=endpoint, access="abc", secret="abc")
+        assert handler.probes == 5
+
+
+def test_concurrent_version_probes():
+    with mock_server() as (endpoint, handler):
+        handler.delay = 0.5
+
+        def connect(_):
+            return vastdb.connect(endpoint=endpoint, access="abc", secret="abc").api.vast_version
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            versions = list(executor.map(connect, range(8)))
+
+        assert versions == [(5, 2, 0, 10)] * 8
+        assert handler.probes == 1
+
+
+def test_connection_reuse_across_many_endpoints():
+    with contextlib.ExitStack() as stack:
+        servers = [stack.enter_context(mock_server()) for _ in range(12)]  # more than urllib3's default host pools
+        s = vastdb.connect(endpoint=servers[0][0], access="abc", secret="abc")
+        for _ in range(5):
+            for endpoint, _handler in servers:
+                with s.api.with_endpoint(endpoint) as api:
+                    api.refresh_version()
+
+        assert [handler.connections for _endpoint, handler in servers] == [1] * len(servers)
+
+
+def test_idle_connection_pools_are_bounded(monkeypatch):
+    monkeypatch.setattr(_internal, 'MAX_IDLE_SHARED_ADAPTERS', 2)
+
+    def registered(apis):
+        return [api.url for api in apis if any(key[0] == api.url for key in _internal._SHARED_ADAPTERS)]
+
+    with contextlib.ExitStack() as stack:
+        servers = [stack.enter_context(mock_server()) for _ in range(4)]
+        s = vastdb.connect(endpoint=servers[0][0], access="abc", secret="abc")
+        apis = []
+        for endpoint, _handler in servers:
+            with s.api.with_endpoint(endpoint) as api:
+                api.refresh_version()
+            apis.append(api)
+
+        # the first endpoint is still used by `s`, and only the 2 most recently released ones are kept idle
+        assert registered(apis) == [apis[0].url, apis[2].url, apis[3].url]
+
+        # connections to the evicted endpoint were closed, so a new one is opened
+        with s.api.with_endpoint(servers[1][0]) as api:
+            api.refresh_version()
+        assert servers[1][1].connections == 2
+        assert registered(apis) == [apis[0].url, apis[1].url, apis[3].url]
+
+        # unclosed sessions release their adapters when garbage-collected
+        del s
+        gc.collect()
+        assert not any(key[0] == apis[0].url for key in _internal._SHARED_ADAPTER_USERS)
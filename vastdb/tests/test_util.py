@@ -23,6 +23,40 @@ def test_slices():
     assert t == pa.Table.from_batches(_parse(chunks))
 
 
+def test_fixed_width_slices_skip_row_sizes(monkeypatch):
+    def fail(*args):
+        raise AssertionError("per-row sizes should not be computed for fixed-width columns")
+
+    monkeypatch.setattr(util, '_cumulative_row_sizes', fail)
+    t = pa.table({"x": range(1 << 20), "y": [i / 1000 for i in range(1 << 20)]})
+    chunks = list(util.iter_serialized_slices(t))
+    assert t == pa.Table.from_batches(_parse(chunks))
+
+
+def test_slices_are_measured_once(monkeypatch):
+    measured = []
+    serialized_size = util._serialized_size
+    monkeypatch.setattr(util, '_serialized_size', lambda batch: measured.append(len(batch)) or serialized_size(batch))
+
+    t = pa.table({"x": ['a' * 1000] * 20000})
+    chunks = list(util.iter_serialized_slices(t))
+    assert len(chunks) > 1
+    assert len(measured) == len(chunks)
+    assert t == pa.Table.from_batches(_parse(chunks))
+
+
+def test_skewed_slices():
+    wide_rows = 100
+    t = pa.table({"x": ['a' * 100000] * wide_rows + ['b'] * 100000})
+
+    chunks = list(util.iter_serialized_slices(t))
+    sizes = [len(c) for c in chunks]
+
+    assert max(sizes) < util.MAX_RECORD_BATCH_SLICE_SIZE
+    assert t == pa.Table.from_batches(_parse(chunks))
+    assert len(chunks) <= 4  # narrow rows are not split further because of the wide ones
+
+
 def test_wide_row():
     cols = [pa.field(f"x{i}", pa.utf8()) for i in range(1000)]
     values = [['a' * 10000]] * len(cols)
@@ -33,11 +67,35 @@ def test_wide_row():
         list(util.iter_serialized_slices(t))
 
 
+def test_compressed_slices():
+    t = pa.table({"x": ['a' * 1000] * 20000})
+    chunks = list(util.iter_serialized_slices(t, compression='zstd'))
+    assert len(chunks) > 1
+    assert t == pa.Table.from_batches(_parse(chunks))
+
+    # row width is checked before compression
+    cols = [pa.field(f"x{i}", pa.utf8()) for i in range(1000)]
+    values = [['a' * 10000]] * len(cols)
+    t = pa.table(values, schema=pa.schema(cols))
+    assert len(t) == 1
+    with pytest.raises(errors.TooWideRow):
+        list(util.iter_serialized_slices(t, compression='zstd'))
+
+
 def test_expand_ip_ranges():
     endpoints = ["http://172.19.101.1-3"]
     expected = ["http://172.19.101.1", "http://172.19.101.2", "http://172.19.101.3"]
     assert util.expand_ip_ranges(endpoints) == expected
 
+    endpoints = ["https://10.0.0.254-255:8443", "http://localhost:9090"]
+    expected = ["https://10.0.0.254:8443", "https://10.0.0.255:8443", "http://localhost:9090"]
+    assert util.expand_ip_ranges(endpoints) == expected
+
+    with pytest.raises(ValueError):
+        util.expand_ip_ranges(["http://172.19.101.3-1"])
+    with pytest.raises(ValueError):
+        util.expand_ip_ranges(["http://172.19.101.1-256"])
+
 
 def _parse(bufs):
     for buf in bufs:
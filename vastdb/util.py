@@ -1,7 +1,10 @@
+import ipaddress
 import logging
+import math
 import re
 from typing import TYPE_CHECKING, Callable, List, Optional, Union
 
+import numpy as np
 import pyarrow as pa
 import pyarrow.compute as pc
 import pyarrow.parquet as pq
@@ -88,57 +91,152 @@ MAX_RECORD_BATCH_SLICE_SIZE = int(0.9 * MAX_TABULAR_REQUEST_SIZE)
 MAX_QUERY_DATA_REQUEST_SIZE = int(0.9 * MAX_TABULAR_REQUEST_SIZE)
 
 
-def iter_serialized_slices(batch: Union[pa.RecordBatch, pa.Table], max_rows_per_slice=None):
-    """Iterate over a list of record batch slices."""
-    if batch.nbytes:
-        rows_per_slice = int(0.9 * len(batch) * MAX_RECORD_BATCH_SLICE_SIZE / batch.nbytes)
-    else:
-        rows_per_slice = len(batch)  # if the batch has no buffers (no rows/columns)
+def _cumulative_row_sizes(batch: Union[pa.RecordBatch, pa.Table], variable_columns, fixed_size: int) -> np.ndarray:
+    """Estimate the serialized size of each rows' prefix (in bytes), i.e. `result[i]` is the size of the first `i` rows."""
+    result = np.arange(len(batch) + 1, dtype=np.int64)
+    result *= fixed_size
+    for column in variable_columns:
+        chunks = column.chunks if isinstance(column, pa.ChunkedArray) else [column]
+        large = pa.types.is_large_string(column.type) or pa.types.is_large_binary(column.type)
+        offset_dtype: np.dtype = np.dtype(np.int64 if large else np.int32)
+        row = 0
+        total = 0
+        for chunk in chunks:
+            if not len(chunk):
+                continue
+            # the offsets buffer already holds the cumulative sizes of the chunk's values (zero-copy view)
+            offsets: np.ndarray = np.frombuffer(chunk.buffers()[1], dtype=offset_dtype, count=len(chunk) + 1, offset=chunk.offset * offset_dtype.itemsize)
+            result[row + 1:row + len(chunk) + 1] += offsets[1:] + (total - int(offsets[0]))
+            row += len(chunk)
+            total += int(offsets[-1] - offsets[0])
+    return result
 
-    if max_rows_per_slice is not None:
-        rows_per_slice = min(rows_per_slice, max_rows_per_slice)
 
+def _iter_slice_bounds(batch: Union[pa.RecordBatch, pa.Table], max_rows_per_slice=None):
+    """Iterate over (offset, length) of the planned slices."""
+    budget = int(0.9 * MAX_RECORD_BATCH_SLICE_SIZE)
+    fixed_size = 0.0  # bytes per row, shared by all rows
+    variable_columns = []
+    for column in batch.columns:
+        if pa.types.is_string(column.type) or pa.types.is_binary(column.type):
+            fixed_size += 4  # 32-bit offsets
+            variable_columns.append(column)
+        elif pa.types.is_large_string(column.type) or pa.types.is_large_binary(column.type):
+            fixed_size += 8  # 64-bit offsets
+            variable_columns.append(column)
+        else:
+            fixed_size += column.nbytes / len(batch)  # assume uniform distribution across rows
+
+    if not variable_columns:
+        # all rows have the same estimated size
+        if batch.nbytes:
+            rows_per_slice = int(0.9 * len(batch) * MAX_RECORD_BATCH_SLICE_SIZE / batch.nbytes)
+        else:
+            rows_per_slice = len(batch)  # if the batch has no buffers (no rows/columns)
+        if max_rows_per_slice is not None:
+            rows_per_slice = min(rows_per_slice, max_rows_per_slice)
+        rows_per_slice = max(rows_per_slice, 1)  # too wide rows are detected during serialization
+        for offset in range(0, len(batch), rows_per_slice):
+            yield offset, min(rows_per_slice, len(batch) - offset)
+        return
+
+    # binary-search each slice's end, so the Python loop below is per slice (not per row)
+    sizes = _cumulative_row_sizes(batch, variable_columns, math.ceil(fixed_size))
     offset = 0
     while offset < len(batch):
-        if rows_per_slice < 1:
-            raise TooWideRow(batch)
-
-        batch_slice = batch.slice(offset, rows_per_slice)
-        serialized_slice_batch = serialize_record_batch(batch_slice)
-        if len(serialized_slice_batch) <= MAX_RECORD_BATCH_SLICE_SIZE:
-            yield serialized_slice_batch
-            offset += rows_per_slice
-        else:
-            rows_per_slice = rows_per_slice // 2
+        end = int(np.searchsorted(sizes, sizes[offset] + budget, side='right')) - 1
+        end = max(end, offset + 1)  # too wide rows are detected during serialization
+        if max_rows_per_slice is not None:
+            end = min(end, offset + max_rows_per_slice)
+        yield offset, end - offset
+        offset = end
+
+
+def _iter_serialized_halves(batch: Union[pa.RecordBatch, pa.Table], compression: Optional[str] = None):
+    """Serialize a batch, splitting it recursively if it exceeds the maximal slice size."""
+    batch = _as_single_batch(batch)
+    size = _serialized_size(batch)
+    if size <= MAX_RECORD_BATCH_SLICE_SIZE:
+        yield serialize_record_batch(batch, compression=compression) if compression else _serialize_into_buffer(batch, size)
+        return
+
+    if len(batch) <= 1:
+        raise TooWideRow(batch)
+
+    middle = len(batch) // 2
+    yield from _iter_serialized_halves(batch.slice(0, middle), compression=compression)
+    yield from _iter_serialized_halves(batch.slice(middle), compression=compression)
+
+
+def iter_serialized_slices(batch: Union[pa.RecordBatch, pa.Table], max_rows_per_slice=None, compression: Optional[str] = None):
+    """Iterate over a list of record batch slices.
+
+    Slices are planned according to their uncompressed size (which is also used for raising `TooWideRow`),
+    and are then compressed if `compression` (e.g. 'lz4' or 'zstd') is specified.
+    """
+    if not len(batch):
+        return
+
+    for offset, length in _iter_slice_bounds(batch, max_rows_per_slice):
+        yield from _iter_serialized_halves(batch.slice(offset, length), compression=compression)
 
 
-def serialize_record_batch(batch: Union[pa.RecordBatch, pa.Table]):
-    """Serialize a RecordBatch using Arrow IPC format."""
+def _write_stream(sink, batch: Union[pa.RecordBatch, pa.Table], compression: Optional[str] = None):
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    with pa.ipc.new_stream(sink, batch.schema, options=options) as writer:
+        writer.write(batch)
+
+
+def _serialized_size(batch: Union[pa.RecordBatch, pa.Table]) -> int:
+    """Compute the size of a serialized batch, without copying its data."""
+    sink = pa.MockOutputStream()
+    _write_stream(sink, batch)
+    return sink.size()
+
+
+def _as_single_batch(batch: Union[pa.RecordBatch, pa.Table]) -> Union[pa.RecordBatch, pa.Table]:
     if isinstance(batch, pa.Table):
         if len(batch.to_batches()) > 1:
             # the server expects a single RecordBatch per request
             batch = batch.combine_chunks()
+    return batch
 
-    sink = pa.BufferOutputStream()
-    with pa.ipc.new_stream(sink, batch.schema) as writer:
-        writer.write(batch)
-    return sink.getvalue()
+
+def _serialize_into_buffer(batch: Union[pa.RecordBatch, pa.Table], size: int) -> pa.Buffer:
+    """Serialize a single-chunk batch into a pre-allocated buffer of its (already measured) serialized size."""
+    # pre-allocating the output buffer avoids reallocations (and copying) while writing
+    buf = pa.allocate_buffer(size)
+    _write_stream(pa.FixedSizeBufferWriter(buf), batch)
+    return buf
+
+
+def serialize_record_batch(batch: Union[pa.RecordBatch, pa.Table], compression: Optional[str] = None):
+    """Serialize a RecordBatch using Arrow IPC format (optionally compressing its buffers)."""
+    batch = _as_single_batch(batch)
+
+    if compression:
+        sink = pa.BufferOutputStream()
+        _write_stream(sink, batch, compression=compression)
+        return sink.getvalue()
+
+    return _serialize_into_buffer(batch, _serialized_size(batch))
+
+
+_IP_RANGE_PATTERN = re.compile(r"(https?://)(\d+\.\d+\.\d+)\.(\d+)-(\d+)(.*)")
 
 
 def expand_ip_ranges(endpoints):
     """Expands endpoint strings that include an IP range in the format 'http://172.19.101.1-16'."""
     expanded_endpoints = []
-    pattern = re.compile(r"(http://\d+\.\d+\.\d+)\.(\d+)-(\d+)")
-
     for endpoint in endpoints:
-        match = pattern.match(endpoint)
+        match = _IP_RANGE_PATTERN.fullmatch(endpoint)
         if match:
-            base_url = match.group(1)
-            start_ip = int(match.group(2))
-            end_ip = int(match.group(3))
+            scheme, network, start, end, suffix = match.groups()
+            start_ip = int(ipaddress.IPv4Address(f"{network}.{start}"))
+            end_ip = int(ipaddress.IPv4Address(f"{network}.{end}"))
             if start_ip > end_ip:
                 raise ValueError("Start IP cannot be greater than end IP in the range.")
-            expanded_endpoints.extend(f"{base_url}.{ip}" for ip in range(start_ip, end_ip + 1))
+            expanded_endpoints.extend(f"{scheme}{ipaddress.IPv4Address(ip)}{suffix}" for ip in range(start_ip, end_ip + 1))
         else:
             expanded_endpoints.append(endpoint)
     return expanded_endpoints
@@ -163,7 +261,7 @@ def prefix_to_range(prefix: str):
     """Compute (L, U) such that `s.starts_with(prefix)` is equivalent to `L <= s.encode() < H`."""
     assert prefix, "Empty prefix is not convertible to range predicate"
     lower = prefix.encode()
-    upper = bytearray(lower)
-    # https://en.wikipedia.org/wiki/UTF-8#Encoding guarantees that the last byte is not 0xFF
-    upper[-1] = upper[-1] + 1
-    return (lower, bytes(upper))
+    # increment the encoded prefix as a big-endian integer (without copying it into a mutable buffer)
+    # https://en.wikipedia.org/wiki/UTF-8#Encoding guarantees that the last byte is not 0xFF, so there is no overflow
+    upper = (int.from_bytes(lower, 'big') + 1).to_bytes(len(lower), 'big')
+    return (lower, upper)